@@ -38,14 +38,31 @@
 # specified via command-line arguments.
 
 import argparse
+import asyncio
+import locale
 import logging
-import re
-import shutil
+import os
+import string
 import subprocess
 import sys
 import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
+
+# Markers in the pbi-tools compile output
+_PBIT_MARKER = "pbit file written to:"  # matched case-insensitively
+# ASCII-only lowercasing keeps string length, so indices map back to the original
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_V3_MARKER = "does not contain a V3 model"
+
+# Separator logged before each processed file
+_SEP = "-" * 70
+
+# On Windows, don't set up a console for each pbi-tools process; close_fds is already
+# the default, so no handles are inherited
+_SUBPROCESS_KWARGS = {"creationflags": subprocess.CREATE_NO_WINDOW} if os.name == "nt" else {}
 
 
 def get_logger(name: str = __name__, level: int = logging.DEBUG) -> logging.Logger:
@@ -84,7 +101,7 @@ def get_logger(name: str = __name__, level: int = logging.DEBUG) -> logging.Logg
 
     return logger
 
-logger = get_logger("pbi_converter")
+logger = get_logger("pbi_converter", logging.INFO)
 
 def parse_arguments() -> argparse.Namespace:
     """
@@ -102,14 +119,18 @@ PowerShell Examples:
     --temp-folder "C:\\Users\\myuser\\temp" `
     --cli-path "C:\\Users\\myuser\\pbi-tools.1.2.0" `
     --core-path "C:\\Users\\myuser\\pbi-tools.core.1.2.0_win-x64" `
-    --clean 2> "ConverterError.log" | Tee-Object -FilePath "ConverterOutput.log"
+    --clean --verbose 2> "ConverterError.log" | Tee-Object -FilePath "ConverterOutput.log"
 
 
 Notes:
 - The script recursively searches for .pbix files in the report folder and subdirectories.
-- Converted .pbit files are saved in the output folder, mirroring the original folder structure.
+- Converted .pbit files are saved in the output folder, mirroring the original folder structure,
+  and are named after their .pbix file.
 - Extracted contents are temporarily stored in the temp folder, also mirroring the structure.
 - Use --clean to automatically remove the extraction folders after successful conversion.
+- Files whose .pbit is newer than the .pbix are skipped; use --force to convert them anyway.
+- Use --verbose to log the full pbi-tools output of failed commands.
+- Use --workers to set how many files are extracted and compiled in parallel (default: CPU count).
 - Run with -h or --help for detailed argument information.
 
 Pre-Requirements:
@@ -135,7 +156,7 @@ Tutorial:
     --temp-folder "$cwd\\temp" `
     --cli-path "$cwd\\pbi-tools.1.2.0" `
     --core-path "$cwd\\pbi-tools.core.1.2.0_win-x64" `
-    --clean 2> "ConverterError.log" | Tee-Object -FilePath "ConverterOutput.log"
+    --clean --verbose 2> "ConverterError.log" | Tee-Object -FilePath "ConverterOutput.log"
 
         """
     )
@@ -174,7 +195,26 @@ Tutorial:
         action="store_true",
         help="Clean the temp folder after successful conversion."
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "-w", "--workers",
+        type=int,
+        default=None,
+        help="Number of parallel extract and compile workers (default: CPU count)."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert all files, even those whose .pbit is already up to date."
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log debug details, such as the full pbi-tools output of failed commands."
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
 
 
 def validate_paths(cli_path: Path, core_path: Path) -> None:
@@ -194,64 +234,149 @@ def find_pbix_files(report_folder: Path) -> List[Path]:
     Recursively find all .pbix files in the report folder.
     """
     logger.info("Searching for .pbix files in %s...", report_folder)
-    pbix_files = list(report_folder.rglob("*.pbix"))
+    pbix_files = []
+    if not report_folder.is_dir():
+        logger.error("Report folder not found or not a directory: %s", report_folder)
+        return pbix_files
+    # os.scandir reuses the DirEntry type info, avoiding the extra stat() per entry of rglob
+    pending = [str(report_folder)]
+    while pending:
+        folder = pending.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.lower().endswith(".pbix"):
+                        pbix_files.append(Path(entry.path))
+        except OSError as e:
+            logger.warning("Skipping folder %s: %s", folder, e)
     logger.info("Found %d files.", len(pbix_files))
     return pbix_files
 
 
+# Directories already created during this run
+_created_dirs: Set[str] = set()
+
+
+def _mkdir_once(path: Path) -> None:
+    """
+    Create a directory (and parents) unless it was already created in this run.
+    """
+    key = str(path)
+    if key not in _created_dirs:
+        path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(key)
+
+
+def map_folders(
+    pbix_files: List[Path],
+    report_folder: Path,
+    output_folder: Path,
+    temp_folder: Path
+) -> Dict[Path, Tuple[Path, Path]]:
+    """
+    Map each folder containing .pbix files to its (target_dir, extract_root) pair,
+    computing the relative path once per folder instead of once per file.
+    """
+    folders: Dict[Path, Tuple[Path, Path]] = {}
+    for pbix_file in pbix_files:
+        parent = pbix_file.parent
+        if parent not in folders:
+            relative_parent = parent.relative_to(report_folder)
+            folders[parent] = (output_folder / relative_parent, temp_folder / relative_parent)
+    return folders
+
+
+def is_up_to_date(pbix_file: Path, pbit_file: Path) -> bool:
+    """
+    Check whether the .pbit file exists and is at least as new as its .pbix file.
+    """
+    try:
+        return pbit_file.stat().st_mtime >= pbix_file.stat().st_mtime
+    except OSError:
+        # Missing, or not reachable (e.g. a mirrored output folder exists as a file)
+        return False
+
+
+def is_pbix_archive(pbix_file: Path) -> bool:
+    """
+    Cheap precheck before starting pbi-tools: a .pbix file is a ZIP archive,
+    so anything that cannot be opened as one would only fail in extraction.
+    """
+    try:
+        with zipfile.ZipFile(pbix_file) as archive:
+            return bool(archive.namelist())
+    except (zipfile.BadZipFile, OSError):
+        return False
+
+
 def ensure_directories(output_folder: Path, target_dir: Path, extract_folder: Path, temp_folder: Path) -> None:
     """
     Ensure the necessary directories exist.
     """
-    output_folder.mkdir(parents=True, exist_ok=True)
-    target_dir.mkdir(parents=True, exist_ok=True)
-    extract_folder.mkdir(parents=True, exist_ok=True)
-    temp_folder.mkdir(parents=True, exist_ok=True)
+    _mkdir_once(output_folder)
+    _mkdir_once(target_dir)
+    _mkdir_once(extract_folder)
+    _mkdir_once(temp_folder)
 
 
-def run_subprocess(command: List[str], description: str) -> Optional[str]:
+async def run_subprocess(command: List[str], description: str) -> Optional[str]:
     """
     Run a subprocess command and return stdout if successful, otherwise log error.
     """
+    # pbi-tools has no interactive/server mode and extract/compile take a single
+    # input per call, so every call pays the .NET startup; --workers overlaps it.
+    # stderr is only ever logged at DEBUG level, so don't buffer it otherwise
+    debug = logger.isEnabledFor(logging.DEBUG)
     try:
-        result = subprocess.run(    
-            command,
-            capture_output=True,
-            text=True,
-            check=True  # Raises CalledProcessError on non-zero exit code
-        )
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        if "could not be deserialized" in e.stdout:
-            logger.error("File model is not supported. Model required: V3")    
-        else:
-            logger.error("Error while processing the file. Check the logs for more information.")
-        logger.debug(
-            "%s failed with return code %d: %s\nCommand: %s\nStdout: %s\nStderr: %s",
-            description, e.returncode, e,
-            " ".join(command), e.stdout, e.stderr
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE if debug else asyncio.subprocess.DEVNULL,
+            **_SUBPROCESS_KWARGS
         )
-        return None
+        stdout_bytes, stderr_bytes = await process.communicate()
     except Exception as e:
         logger.error("Unexpected error during %s: %s", description, e)
         return None
 
+    # Same encoding as subprocess.run(text=True), without failing on stray bytes
+    encoding = locale.getpreferredencoding(False)
+    stdout = stdout_bytes.decode(encoding, errors="replace")
+    if process.returncode == 0:
+        return stdout
 
-def extract_pbix(cli_path: Path, pbix_file: Path, extract_folder: Path) -> Optional[str]:
+    if "could not be deserialized" in stdout:
+        logger.error("Failed %s: File model is not supported. Model required: V3", description)
+    else:
+        logger.error("Failed %s: Error while processing the file. Re-run with --verbose for details.",
+                     description)
+    # The output can be large: only decode and join it when it will be logged
+    if debug:
+        logger.debug(
+            "%s failed with return code %d\nCommand: %s\nStdout: %s\nStderr: %s",
+            description, process.returncode,
+            " ".join(command), stdout, stderr_bytes.decode(encoding, errors="replace")
+        )
+    return None
+
+
+async def extract_pbix(cli_path: str, pbix_file: Path, extract_folder: Path) -> Optional[str]:
     """
     Extract the contents of a .pbix file using pbi-tools.
     """
     command = [
-        str(cli_path),
+        cli_path,
         "extract",
         str(pbix_file),
         "-extractFolder",
         str(extract_folder)
     ]
-    return run_subprocess(command, f"extraction of {pbix_file.name}")
+    return await run_subprocess(command, f"extraction of {pbix_file.name}")
 
 
-def compile_to_pbit(core_path: Path, extract_folder: Path, target_dir: Path) -> Optional[str]:
+async def compile_to_pbit(core_path: str, extract_folder: Path, target_dir: Path) -> Optional[str]:
     """
     Compile the extracted contents to a .pbit file.
     """
@@ -259,56 +384,110 @@ def compile_to_pbit(core_path: Path, extract_folder: Path, target_dir: Path) ->
     extract_path = str(extract_folder)
     target_path = str(target_dir)
     command = [
-        str(core_path),
+        core_path,
         "compile",
         extract_path,
         target_path,
         "PBIT",
         "True"
     ]
-    return run_subprocess(command, f"compilation to PBIT in {target_dir}")
+    return await run_subprocess(command, f"compilation of {extract_folder.name} to PBIT in {target_dir}")
 
 
 def parse_pbit_output(stdout: str) -> Optional[str]:
     """
     Parse the compilation output to extract the .pbit file path.
     """
-    pbit_pattern = r"PBIT file written to: (.*)"
-    match = re.search(pbit_pattern, stdout, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    if "does not contain a V3 model" in stdout:
+    # The path line comes at the end of the output, so search backwards in a
+    # lowercased copy and slice the original at the same index
+    index = stdout.translate(_ASCII_LOWER).rfind(_PBIT_MARKER)
+    if index != -1:
+        start = index + len(_PBIT_MARKER)
+        end = stdout.find("\n", start)
+        return stdout[start:end if end != -1 else None].strip()
+    if _V3_MARKER in stdout:
         logger.warning("Skipping: PBIX requires V3 model")
     else:
         logger.error("Failed to parse PBIT output path")
     return None
 
 
-def process_pbix_file(
+# Extract folders are removed in the background so the pipeline does not wait on them
+_cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+
+
+def remove_tree(path: str) -> None:
+    """
+    Recursively delete a folder, ignoring errors like shutil.rmtree(ignore_errors=True).
+    Uses the DirEntry type info from os.scandir instead of an extra stat() per entry.
+    """
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        remove_tree(entry.path)
+                    else:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+        os.rmdir(path)
+    except OSError:
+        pass
+
+
+def clean_extract_folder(extract_folder: Path) -> None:
+    """
+    Remove an extract folder, together with its per-file container, after a
+    successful conversion.
+    """
+    container = extract_folder.parent
+    remove_tree(str(container))
+    logger.info("Extract folder cleaned: %s", container)
+
+
+async def extract_stage(
     pbix_file: Path,
     output_folder: Path,
-    cli_path: Path,
-    core_path: Path,
-    report_folder: Path,
+    cli_path: str,
     temp_folder: Path,
-    clean_extract: bool = False
-) -> None:
+    target_dir: Path,
+    extract_root: Path
+) -> Optional[Path]:
     """
-    Process a single .pbix file: extract, compile, and log the result.
+    First pipeline stage: prepare the folders and extract a single .pbix file.
+    Returns the extract folder on success, otherwise None.
     """
     try:
-        relative_path = pbix_file.relative_to(report_folder)
-        target_dir = output_folder / relative_path.parent
-        extract_folder = temp_folder / relative_path.parent
-        logger.info("-" * 70)
+        # One extract folder per file, so parallel workers never share it. It sits in a
+        # container named after the full file name (e.g. temp/S.pbix/S), which cannot
+        # clash with a mirrored subfolder such as temp/S; the inner folder keeps the
+        # stem because pbi-tools names the .pbit after it.
+        extract_folder = extract_root / pbix_file.name / pbix_file.stem
+        logger.info(_SEP)
         logger.info("Processing: %s", pbix_file)
         ensure_directories(output_folder, target_dir, extract_folder, temp_folder)
-        # Extract
-        extract_stdout = extract_pbix(cli_path, pbix_file, extract_folder)
+        extract_stdout = await extract_pbix(cli_path, pbix_file, extract_folder)
         if not extract_stdout:
-            return
-        # Compile
-        compile_stdout = compile_to_pbit(core_path, extract_folder, target_dir)
+            return None
+        return extract_folder
+    except Exception as e:
+        logger.error("Unexpected error processing %s: %s", pbix_file, e)
+        return None
+
+
+async def compile_stage(
+    pbix_file: Path,
+    core_path: str,
+    target_dir: Path,
+    extract_folder: Path,
+    clean_extract: bool = False
+) -> None:
+    """
+    Second pipeline stage: compile an extracted .pbix file and log the result.
+    """
+    try:
+        compile_stdout = await compile_to_pbit(core_path, extract_folder, target_dir)
         if not compile_stdout:
             return
         # Parse output
@@ -316,8 +495,7 @@ def process_pbix_file(
         if pbit_file_path:
             logger.info("Output: %s", pbit_file_path)
             if clean_extract:
-                shutil.rmtree(extract_folder, ignore_errors=True)
-                logger.info("Extract folder cleaned: %s", extract_folder)
+                _cleanup_pool.submit(clean_extract_folder, extract_folder)
         else:
             logger.warning("No PBIT file generated for %s", pbix_file.name)
     except Exception as e:
@@ -326,13 +504,90 @@ def process_pbix_file(
 
 def format_duration(seconds: float) -> str:
     """
-    Format seconds into a human-readable duration (e.g., '1m 23s').
+    Format seconds into a human-readable duration (e.g., '1m 23s', '2h 5m 0s').
     """
-    minutes = int(seconds // 60)
-    secs = int(seconds % 60)
-    if minutes > 0:
+    secs = int(seconds)
+    if secs < 60:
+        return f"{secs}s"
+    minutes, secs = divmod(secs, 60)
+    if minutes < 60:
         return f"{minutes}m {secs}s"
-    return f"{secs}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m {secs}s"
+
+
+async def convert_files(
+    pbix_files: List[Path],
+    output_folder: Path,
+    cli_path: str,
+    core_path: str,
+    folders: Dict[Path, Tuple[Path, Path]],
+    temp_folder: Path,
+    clean_extract: bool,
+    workers: int
+) -> float:
+    """
+    Convert all .pbix files through a two-stage pipeline: `workers` extract workers
+    feed `workers` compile workers, so one file compiles while the next extracts.
+    Returns the total wall-clock time.
+    """
+    total_files = len(pbix_files)
+    processed_count = 0
+    run_start = time.monotonic()
+    last_progress = run_start
+    extract_queue: "asyncio.Queue[Path]" = asyncio.Queue()
+    # Bounded, so extraction does not run far ahead of compilation
+    compile_queue: "asyncio.Queue[Optional[Tuple[Path, Path, Path, float]]]" = asyncio.Queue(maxsize=workers)
+    for pbix_file in pbix_files:
+        extract_queue.put_nowait(pbix_file)
+
+    def file_done(pbix_file: Path, start_time: float) -> None:
+        nonlocal processed_count, last_progress
+        now = time.monotonic()
+        duration = now - start_time
+        processed_count += 1
+        logger.info("Completed %s in %s", pbix_file.name, format_duration(duration))
+
+        # At most one progress line per second
+        if processed_count < total_files and now - last_progress >= 1.0:
+            last_progress = now
+            # Wall-clock throughput already accounts for the parallelism
+            elapsed = now - run_start
+            remaining_files = total_files - processed_count
+            eta_seconds = elapsed / processed_count * remaining_files
+            logger.info("Progress: %d/%d files processed (%.1f%%). ETA: %s",
+                        processed_count, total_files,
+                        (processed_count / total_files) * 100,
+                        format_duration(eta_seconds))
+
+    async def extract_worker() -> None:
+        while not extract_queue.empty():
+            pbix_file = extract_queue.get_nowait()
+            start_time = time.monotonic()
+            target_dir, extract_root = folders[pbix_file.parent]
+            extract_folder = await extract_stage(pbix_file, output_folder, cli_path,
+                                                 temp_folder, target_dir, extract_root)
+            if extract_folder:
+                await compile_queue.put((pbix_file, target_dir, extract_folder, start_time))
+            else:
+                file_done(pbix_file, start_time)
+
+    async def compile_worker() -> None:
+        while True:
+            item = await compile_queue.get()
+            if item is None:
+                return
+            pbix_file, target_dir, extract_folder, start_time = item
+            await compile_stage(pbix_file, core_path, target_dir, extract_folder, clean_extract)
+            file_done(pbix_file, start_time)
+
+    compile_workers = [asyncio.create_task(compile_worker()) for _ in range(workers)]
+    await asyncio.gather(*(extract_worker() for _ in range(workers)))
+    # Extraction is finished: tell each compile worker to stop once the queue drains
+    for _ in compile_workers:
+        await compile_queue.put(None)
+    await asyncio.gather(*compile_workers)
+    return time.monotonic() - run_start
 
 
 def main() -> None:
@@ -341,40 +596,42 @@ def main() -> None:
     to .pbit files in the output folder, mirroring the original folder structure.
     """
     args = parse_arguments()
+    get_logger("pbi_converter", logging.DEBUG if args.verbose else logging.INFO)
     report_folder = Path(args.report_folder)
     output_folder = Path(args.pbit_output)
     temp_folder = Path(args.temp_folder)
     cli_path = Path(args.cli_path) / "pbi-tools.exe"
     core_path = Path(args.core_path) / "pbi-tools.core.exe"
     validate_paths(cli_path, core_path)
+    # Invariant for the whole run: convert to str once instead of per command
+    cli_exe = str(cli_path)
+    core_exe = str(core_path)
     pbix_files = find_pbix_files(report_folder)
     if not pbix_files:
         logger.warning("No .pbix files found. Exiting.")
         return
 
-    total_files = len(pbix_files)
-    processed_count = 0
-    total_time = 0.0
-
+    folders = map_folders(pbix_files, report_folder, output_folder, temp_folder)
+    pending_files = []
     for pbix_file in pbix_files:
-        start_time = time.time()
-        process_pbix_file(pbix_file, output_folder, cli_path, core_path,
-                          report_folder, temp_folder, args.clean)
-        duration = time.time() - start_time
-        processed_count += 1
-        total_time += duration
-
-        logger.info("Completed %s in %s", pbix_file.name, format_duration(duration))
-
-        if processed_count < total_files:
-            avg_time = total_time / processed_count
-            remaining_files = total_files - processed_count
-            eta_seconds = avg_time * remaining_files
-            logger.info("Progress: %d/%d files processed (%.1f%%). ETA: %s",
-                        processed_count, total_files,
-                        (processed_count / total_files) * 100,
-                        format_duration(eta_seconds))
+        pbit_target = folders[pbix_file.parent][0] / (pbix_file.stem + ".pbit")
+        if not args.force and is_up_to_date(pbix_file, pbit_target):
+            logger.info("Up-to-date, skipping %s", pbix_file.name)
+        elif not is_pbix_archive(pbix_file):
+            logger.warning("Skipping %s: not a valid .pbix archive", pbix_file)
+        else:
+            pending_files.append(pbix_file)
+    pbix_files = pending_files
+    if not pbix_files:
+        logger.info("No .pbix files left to convert. Exiting.")
+        return
 
+    workers = args.workers or os.cpu_count() or 1
+    logger.info("Processing with %d worker(s).", workers)
+    total_time = asyncio.run(convert_files(pbix_files, output_folder, cli_exe, core_exe,
+                                           folders, temp_folder, args.clean, workers))
+    # Wait for pending extract folder cleanups
+    _cleanup_pool.shutdown(wait=True)
     logger.info("Conversion process completed. Total time: %s", format_duration(total_time))
 
 